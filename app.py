@@ -8,14 +8,72 @@ import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 import logging
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+import hashlib
+import symtable
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables
 load_dotenv()
 
+# Configure logging; set LOG_LEVEL=WARNING to skip info messages in production
+_log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
+_known_level = isinstance(logging.getLevelName(_log_level), int)
+logging.basicConfig(level=_log_level if _known_level else logging.INFO)
+logger = logging.getLogger(__name__)
+if not _known_level:
+    logger.warning("Unknown LOG_LEVEL %r, falling back to INFO", _log_level)
+
+# Precompiled patterns for response cleanup and C++ line conversion
+_FENCE_OPEN_RE = re.compile(r'```.*?\n')
+_FENCE_CLOSE_RE = re.compile(r'```$')
+_DECL_RE = re.compile(r'(int|float|double|string|bool|auto)\s+(\w+)\s*=\s*')
+_COUT_RE = re.compile(r'std::cout\s*<<\s*')
+_ENDL_RE = re.compile(r'\s*<<\s*std::endl')
+_STREAM_RE = re.compile(r'\s*<<\s*')
+_CIN_RE = re.compile(r'std::cin\s*>>\s*')
+_FUNCDEF_RE = re.compile(r'(int|float|double|string|bool|void)\s+(\w+)\s*\(([^)]*)\)')
+_STRCTOR_RE = re.compile(r'std::string\s*\(\s*"([^"]*)"\s*\)')
+_KW_RE = re.compile(r'\b(?:true|false)\b|&&|\|\|')
+_KW_MAP = {'true': 'True', 'false': 'False', '&&': 'and', '||': 'or'}
+# String/char literals and comments, whose braces don't affect indentation
+_BRACE_NOISE_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|//.*|/\*.*?\*/')
+
+# Prebuilt indentation strings, indexed by nesting depth
+_INDENTS = tuple('    ' * depth for depth in range(32))
+
+# Python operator and module to C++ mappings
+_BINOP_MAP = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/', ast.Mod: '%'}
+_CMPOP_MAP = {ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>='}
+_BOOLOP_MAP = {ast.And: '&&', ast.Or: '||'}
+_UNARYOP_MAP = {ast.UAdd: '+', ast.USub: '-', ast.Not: '!'}
+_IMPORT_INCLUDES = {'math': '<cmath>', 'random': '<random>', 'time': '<ctime>'}
+
+# Gemini prompt; the stable head is formatted per language pair and the source appended
+_PROMPT_TMPL = (
+    "You are a professional code converter. Convert the following {src} code to {tgt}.\n"
+    "Follow these guidelines:\n"
+    "1. Maintain the exact same functionality\n"
+    "2. Use proper {tgt} conventions and best practices\n"
+    "3. Include necessary imports/headers\n"
+    "4. Handle edge cases and error conditions\n"
+    "5. Use appropriate data types and structures\n"
+    "6. Add comments for complex logic\n"
+    "7. Ensure proper memory management (for C++)\n"
+    "8. Follow the language's style guide\n"
+    "\n"
+    "{src} code:\n"
+)
+_PROMPT_TAIL = "\n\nProvide only the converted code without any explanations or markdown formatting.\n"
+_PROMPT_FRAGMENT_TAIL = (
+    "\n\nThis is one fragment of a larger file. Only add a main function if the fragment has "
+    "top-level statements to run.\n" + _PROMPT_TAIL.lstrip('\n')
+)
+
+# Pygments lexers and formatter are reused across highlight calls
+_PY_LEXER = PythonLexer()
+_CPP_LEXER = CppLexer()
+_FORMATTER = HtmlFormatter(style='monokai')
+
 # Configure Gemini AI
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 if GOOGLE_API_KEY:
@@ -24,7 +82,7 @@ if GOOGLE_API_KEY:
         model = genai.GenerativeModel('gemini-1.5-flash')
         logger.info("Gemini AI configured successfully")
     except Exception as e:
-        logger.error(f"Failed to configure Gemini AI: {str(e)}")
+        logger.error("Failed to configure Gemini AI: %s", e)
         st.error("Failed to initialize AI features. Please check your API key.")
 else:
     logger.warning("Google API key not found")
@@ -39,6 +97,7 @@ def format_code(code, language):
             lines = code.split('\n')
             formatted_lines = []
             indent_level = 0
+            in_comment = False
             
             for line in lines:
                 line = line.strip()
@@ -46,224 +105,436 @@ def format_code(code, language):
                     formatted_lines.append('')
                     continue
                     
-                if line.startswith('}'):
-                    indent_level = max(0, indent_level - 1)
+                code_part = line
+                if in_comment:
+                    # Inside a /* */ comment that started on an earlier line
+                    end = code_part.find('*/')
+                    code_part = code_part[end + 2:] if end >= 0 else ''
+                    in_comment = end < 0
+                code_part = _BRACE_NOISE_RE.sub('', code_part)
+                start = code_part.find('/*')
+                if start >= 0:
+                    code_part = code_part[:start]
+                    in_comment = True
+                code_part = code_part.strip()
+                
+                opens = code_part.count('{')
+                closes = code_part.count('}')
+                # A leading '}' dedents its own line; other braces affect the lines after it
+                pre = closes if code_part.startswith('}') else 0
+                indent_level = max(0, indent_level - pre)
                 
-                formatted_lines.append('    ' * indent_level + line)
+                indent = _INDENTS[indent_level] if indent_level < len(_INDENTS) else '    ' * indent_level
+                formatted_lines.append(indent + line)
                 
-                if line.endswith('{'):
-                    indent_level += 1
+                indent_level = max(0, indent_level + opens - (closes - pre))
                     
             return '\n'.join(formatted_lines)
     except Exception as e:
-        logger.error(f"Error formatting code: {str(e)}")
+        logger.error("Error formatting code: %s", e)
         return code
 
-def get_ai_enhanced_conversion(source_code, source_lang, target_lang):
-    """Use Gemini AI to enhance code conversion."""
+def _generate(prompt):
+    """Send a prompt to Gemini and return the cleaned response text."""
+    response = model.generate_content(prompt)
+    converted_code = response.text.strip()
+    
+    # Clean up the response
+    converted_code = _FENCE_OPEN_RE.sub('', converted_code)
+    converted_code = _FENCE_CLOSE_RE.sub('', converted_code)
+    return converted_code.strip()
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _call_gemini(prompt_hash, _prompt):
+    """Send a prompt to Gemini, caching the cleaned response by prompt hash.
+
+    Exceptions propagate so failed requests are never cached.
+    """
+    return _generate(_prompt), None
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _call_gemini_batch(prompt_hash, _prompts):
+    """Send several prompts to Gemini concurrently, returning responses in order."""
+    with ThreadPoolExecutor(max_workers=min(len(_prompts), 4)) as pool:
+        return list(pool.map(_generate, _prompts))
+
+def _segment(source_code, node):
+    """Return the source of a top-level statement, including any decorators."""
+    decorators = getattr(node, 'decorator_list', None)
+    if decorators:
+        node = ast.Pass(
+            lineno=decorators[0].lineno, col_offset=0,
+            end_lineno=node.end_lineno, end_col_offset=node.end_col_offset,
+        )
+    return ast.get_source_segment(source_code, node, padded=True)
+
+def _global_names(table):
+    """Collect the global names used in a symbol table and its nested scopes."""
+    names = {sym.get_name() for sym in table.get_symbols() if sym.is_global()}
+    for child in table.get_children():
+        names |= _global_names(child)
+    return names
+
+def _split_top_level(source_code, tree):
+    """Split Python source into independently convertible top-level functions.
+
+    Returns None unless there are at least two functions and none of them
+    uses module-level names other than imports, including sibling functions.
+    Every function fragment is prefixed with the module's imports. The
+    remaining module code forms a last fragment, which is safe to place
+    after the functions because they don't depend on it.
+
+    >>> src = "def add(a, b):\\n    c = a + b\\n    return c\\ndef sub(a, b):\\n    return a - b\\n"
+    >>> len(_split_top_level(src, ast.parse(src)))
+    2
+    """
+    functions = [node for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    if len(functions) < 2:
+        return None
+    
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    imported = {
+        (alias.asname or alias.name).split('.')[0] for node in imports for alias in node.names
+    }
+    
+    module = symtable.symtable(source_code, '<input>', 'exec')
+    scopes = {}
+    module_names = {sym.get_name() for sym in module.get_symbols() if sym.is_assigned() or sym.is_imported()}
+    for child in module.get_children():
+        scopes.setdefault(child.get_name(), set()).update(_global_names(child))
+        # Functions may also bind module names through a global statement
+        module_names |= {
+            sym.get_name() for sym in child.get_symbols() if sym.is_declared_global() and sym.is_assigned()
+        }
+    module_names -= imported
+    
+    for func in functions:
+        # Decorators, defaults and annotations are evaluated in module scope
+        outer = [*func.decorator_list, *func.args.defaults, *filter(None, func.args.kw_defaults), func.returns]
+        outer += [arg.annotation for arg in func.args.posonlyargs + func.args.args + func.args.kwonlyargs]
+        used = {
+            n.id for node in filter(None, outer) for n in ast.walk(node) if isinstance(n, ast.Name)
+        }
+        used |= scopes.get(func.name, set())
+        if used & (module_names - {func.name}):
+            return None
+    
+    prelude = ''.join(_segment(source_code, node) + '\n' for node in imports)
+    chunks = [prelude + _segment(source_code, func) for func in functions]
+    rest = [node for node in tree.body if node not in functions and node not in imports]
+    if rest:
+        chunks.append(prelude + '\n'.join(_segment(source_code, node) for node in rest))
+    return chunks
+
+def _merge_cpp_parts(parts):
+    """Join separately converted C++ fragments, hoisting shared header lines."""
+    includes = {}
+    usings = {}
+    bodies = []
+    for part in parts:
+        body = []
+        for line in part.split('\n'):
+            if line.startswith('#include'):
+                includes.setdefault(line.strip(), None)
+            elif line.startswith('using namespace'):
+                usings.setdefault(line.strip(), None)
+            else:
+                body.append(line)
+        bodies.append('\n'.join(body).strip())
+    header = '\n'.join([*includes, *usings])
+    return header + '\n\n' + '\n\n'.join(body for body in bodies if body)
+
+def get_ai_enhanced_conversion(source_code, source_lang, target_lang, tree=None):
+    """Use Gemini AI to enhance code conversion.
+
+    When a parsed Python ``tree`` with several independent top-level functions
+    is given, each function is converted by a concurrent request and the
+    results are reassembled; otherwise, or if any request fails, the whole
+    source is converted in one request.
+    """
     try:
         if not GOOGLE_API_KEY:
             return None, "API key not configured"
             
-        prompt = f"""You are a professional code converter. Convert the following {source_lang} code to {target_lang}.
-        Follow these guidelines:
-        1. Maintain the exact same functionality
-        2. Use proper {target_lang} conventions and best practices
-        3. Include necessary imports/headers
-        4. Handle edge cases and error conditions
-        5. Use appropriate data types and structures
-        6. Add comments for complex logic
-        7. Ensure proper memory management (for C++)
-        8. Follow the language's style guide
-        
-        {source_lang} code:
-        {source_code}
+        head = _PROMPT_TMPL.format(src=source_lang, tgt=target_lang)
         
-        Provide only the converted code without any explanations or markdown formatting.
-        """
-        
-        response = model.generate_content(prompt)
-        converted_code = response.text.strip()
+        converted_code, error = None, None
+        chunks = None if tree is None else _split_top_level(source_code, tree)
+        if chunks:
+            prompts = [head + chunk + _PROMPT_FRAGMENT_TAIL for chunk in chunks]
+            digest = hashlib.blake2b(digest_size=16)
+            for prompt in prompts:
+                digest.update(prompt.encode())
+                digest.update(b'\0')
+            try:
+                converted_code = _merge_cpp_parts(_call_gemini_batch(digest.hexdigest(), prompts))
+            except Exception as e:
+                logger.warning("Concurrent AI conversion failed, retrying as one request: %s", e)
         
-        # Clean up the response
-        converted_code = re.sub(r'```.*?\n', '', converted_code)
-        converted_code = re.sub(r'```$', '', converted_code)
-        converted_code = converted_code.strip()
+        if converted_code is None:
+            prompt = head + source_code + _PROMPT_TAIL
+            prompt_hash = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+            converted_code, error = _call_gemini(prompt_hash, prompt)
         
-        logger.info(f"Successfully converted {source_lang} to {target_lang}")
-        return converted_code, None
+        logger.info("Successfully converted %s to %s", source_lang, target_lang)
+        return converted_code, error
     except Exception as e:
-        logger.error(f"AI conversion error: {str(e)}")
+        logger.error("AI conversion error: %s", e)
         return None, str(e)
 
 def validate_python_code(code):
+    """Parse Python code, returning the tree (or None) and a status message."""
     try:
-        ast.parse(code)
-        return True, "Valid Python code"
+        tree = ast.parse(code)
+        return tree, "Valid Python code"
     except SyntaxError as e:
-        logger.error(f"Invalid Python code: {str(e)}")
-        return False, f"Invalid Python code: {str(e)}"
+        logger.error("Invalid Python code: %s", e)
+        return None, f"Invalid Python code: {str(e)}"
 
 def validate_cpp_code(code):
     required_elements = [';', '{', '}']
     for element in required_elements:
         if element not in code:
-            logger.error(f"Invalid C++ code: Missing {element}")
+            logger.error("Invalid C++ code: Missing %s", element)
             return False, f"Invalid C++ code: Missing required element '{element}'"
     return True, "Valid C++ code"
 
-def python_to_cpp(python_code):
-    try:
-        tree = ast.parse(python_code)
-        cpp_code = []
-        includes = set(['<iostream>', '<string>'])
-        
-        # First pass: collect includes
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for name in node.names:
-                    if name.name == 'math':
-                        includes.add('<cmath>')
-                    elif name.name == 'random':
-                        includes.add('<random>')
-                    elif name.name == 'time':
-                        includes.add('<ctime>')
-            elif isinstance(node, ast.ImportFrom):
-                if node.module == 'math':
-                    includes.add('<cmath>')
-                elif node.module == 'random':
-                    includes.add('<random>')
-                elif node.module == 'time':
-                    includes.add('<ctime>')
+class _IncludeScan(ast.NodeVisitor):
+    """Find imports nested in statements the emitter does not translate.
+
+    Imports only appear at statement level, so only statement lists are
+    followed and expression subtrees are never entered.
+    """
+
+    def __init__(self, emitter):
+        self.emitter = emitter
+
+    def visit_Import(self, node):
+        self.emitter.visit_Import(node)
+
+    def visit_ImportFrom(self, node):
+        self.emitter.visit_ImportFrom(node)
+
+    def generic_visit(self, node):
+        for field in ('body', 'orelse', 'finalbody', 'handlers', 'cases'):
+            for child in getattr(node, field, ()):
+                self.visit(child)
+
+class PyToCppEmitter(ast.NodeVisitor):
+    """Translate a Python AST to C++ in a single pass.
+
+    Includes are collected while the statements are emitted, so the tree is
+    only traversed once.
+    """
+
+    def __init__(self):
+        # Output lines are kept unindented, alongside their nesting depth
+        self._depths = []
+        self._lines = []
+        self.includes = {'<iostream>', '<string>'}
+        self.depth = 0
+
+    def emit(self, line):
+        self._depths.append(self.depth)
+        self._lines.append(line)
+
+    def render(self):
+        header = '\n'.join(f'#include {inc}' for inc in sorted(self.includes))
+        indents = _INDENTS
+        if self._depths and max(self._depths) >= len(indents):
+            indents = tuple('    ' * depth for depth in range(max(self._depths) + 1))
+        body = ''.join(indents[d] + line + '\n' for d, line in zip(self._depths, self._lines))
         
-        cpp_code.append('\n'.join(f'#include {inc}' for inc in sorted(includes)))
-        cpp_code.append('')
+        if "main" in body:
+            # Drop the newline written after the last emitted line
+            return f"{header}\n\n{body[:-1]}"
         
-        # Second pass: convert code
-        for node in tree.body:
-            if isinstance(node, ast.FunctionDef):
-                return_type = "void"
-                params = []
-                for arg in node.args.args:
-                    param_type = "auto"
-                    if hasattr(arg, 'annotation') and arg.annotation:
-                        if isinstance(arg.annotation, ast.Name):
-                            param_type = arg.annotation.id
-                    params.append(f"{param_type} {arg.arg}")
-                
-                cpp_code.append(f"{return_type} {node.name}({', '.join(params)}) {{")
-                
-                for stmt in node.body:
-                    if isinstance(stmt, ast.Return):
-                        if stmt.value:
-                            cpp_code.append(f"    return {convert_python_expr(stmt.value)};")
-                        else:
-                            cpp_code.append("    return;")
-                    elif isinstance(stmt, ast.Expr):
-                        if isinstance(stmt.value, ast.Call):
-                            if isinstance(stmt.value.func, ast.Name) and stmt.value.func.id == 'print':
-                                args = [convert_python_expr(arg) for arg in stmt.value.args]
-                                cpp_code.append(f"    std::cout << {' << '.join(args)} << std::endl;")
-                            else:
-                                cpp_code.append(f"    {convert_python_expr(stmt.value)};")
-                    elif isinstance(stmt, ast.Assign):
-                        for target in stmt.targets:
-                            cpp_code.append(f"    {convert_python_expr(target)} = {convert_python_expr(stmt.value)};")
-                    elif isinstance(stmt, ast.If):
-                        cpp_code.append(f"    if ({convert_python_expr(stmt.test)}) {{")
-                        for if_stmt in stmt.body:
-                            cpp_code.append(f"        {convert_python_expr(if_stmt)}")
-                        cpp_code.append("    }")
-                        if stmt.orelse:
-                            cpp_code.append("    else {")
-                            for else_stmt in stmt.orelse:
-                                cpp_code.append(f"        {convert_python_expr(else_stmt)}")
-                            cpp_code.append("    }")
-                
-                cpp_code.append("}")
-                cpp_code.append("")
-            elif isinstance(node, ast.Assign):
-                for target in node.targets:
-                    cpp_code.append(f"auto {convert_python_expr(target)} = {convert_python_expr(node.value)};")
-            elif isinstance(node, ast.Expr):
-                if isinstance(node.value, ast.Call):
-                    if isinstance(node.value.func, ast.Name) and node.value.func.id == 'print':
-                        args = [convert_python_expr(arg) for arg in node.value.args]
-                        cpp_code.append(f"std::cout << {' << '.join(args)} << std::endl;")
-                    else:
-                        cpp_code.append(f"{convert_python_expr(node.value)};")
-        
-        if not any("main" in line for line in cpp_code):
-            cpp_code.append("""
+        return f"{header}\n\n{body}" + """
 int main() {
     // Your code will be executed here
     return 0;
-}""")
+}"""
+
+    def generic_visit(self, node):
+        # Statements without a translation may still contain imports
+        _IncludeScan(self).visit(node)
+
+    def visit_Module(self, node):
+        for stmt in node.body:
+            self.visit(stmt)
+
+    def visit_Import(self, node):
+        for name in node.names:
+            if name.name in _IMPORT_INCLUDES:
+                self.includes.add(_IMPORT_INCLUDES[name.name])
+
+    def visit_ImportFrom(self, node):
+        if node.module in _IMPORT_INCLUDES:
+            self.includes.add(_IMPORT_INCLUDES[node.module])
+
+    def visit_FunctionDef(self, node):
+        if self.depth:
+            self.generic_visit(node)
+            return
         
-        return '\n'.join(cpp_code)
-    except Exception as e:
-        logger.error(f"Error converting Python to C++: {str(e)}")
-        return f"Error converting Python to C++: {str(e)}"
+        return_type = "void"
+        params = []
+        for arg in node.args.args:
+            param_type = "auto"
+            if hasattr(arg, 'annotation') and arg.annotation:
+                if isinstance(arg.annotation, ast.Name):
+                    param_type = arg.annotation.id
+            params.append(f"{param_type} {arg.arg}")
+        
+        self.emit(f"{return_type} {node.name}({', '.join(params)}) {{")
+        self.visit_block(node.body)
+        self.emit("}")
+        self.emit("")
 
-def convert_python_expr(node):
-    """Convert Python AST expression to C++ code."""
-    try:
-        if isinstance(node, ast.Num):
-            return str(node.n)
-        elif isinstance(node, ast.Str):
-            return f'"{node.s}"'
-        elif isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.BinOp):
-            op_map = {
-                ast.Add: '+',
-                ast.Sub: '-',
-                ast.Mult: '*',
-                ast.Div: '/',
-                ast.Mod: '%',
-            }
-            op = op_map.get(type(node.op), str(node.op))
-            return f"({convert_python_expr(node.left)} {op} {convert_python_expr(node.right)})"
-        elif isinstance(node, ast.Compare):
-            op_map = {
-                ast.Eq: '==',
-                ast.NotEq: '!=',
-                ast.Lt: '<',
-                ast.LtE: '<=',
-                ast.Gt: '>',
-                ast.GtE: '>=',
-            }
-            ops = [op_map.get(type(op), str(op)) for op in node.ops]
-            return f"({convert_python_expr(node.left)} {' '.join(ops)} {convert_python_expr(node.comparators[0])})"
-        elif isinstance(node, ast.Call):
-            args = [convert_python_expr(arg) for arg in node.args]
-            if isinstance(node.func, ast.Name):
-                if node.func.id == 'print':
-                    return f"std::cout << {' << '.join(args)} << std::endl"
-                elif node.func.id == 'input':
-                    return f"std::cin >> {args[0] if args else 'input_var'}"
+    def visit_block(self, body):
+        self.depth += 1
+        for stmt in body:
+            self.visit(stmt)
+        self.depth -= 1
+
+    def visit_Return(self, node):
+        if node.value:
+            self.emit(f"return {self.convert_python_expr(node.value)};")
+        else:
+            self.emit("return;")
+
+    def visit_Expr(self, node):
+        if isinstance(node.value, ast.Call):
+            self.emit(f"{self.convert_python_expr(node.value)};")
+
+    def visit_Assign(self, node):
+        prefix = '' if self.depth else 'auto '
+        for target in node.targets:
+            self.emit(f"{prefix}{self.convert_python_expr(target)} = {self.convert_python_expr(node.value)};")
+
+    def visit_If(self, node):
+        if not self.depth:
+            self.generic_visit(node)
+            return
+        
+        self.emit(f"if ({self.convert_python_expr(node.test)}) {{")
+        self.visit_block(node.body)
+        self.emit("}")
+        if node.orelse:
+            self.emit("else {")
+            self.visit_block(node.orelse)
+            self.emit("}")
+
+    def _constant(self, node, out):
+        value = node.value
+        if isinstance(value, str):
+            out.append(f'"{value}"')
+        elif isinstance(value, bool):
+            out.append('true' if value else 'false')
+        elif value is None:
+            out.append('nullptr')
+        else:
+            out.append(repr(value))
+
+    def _name(self, node, out):
+        out.append(node.id)
+
+    def _binop(self, node, out):
+        op = _BINOP_MAP.get(type(node.op), str(node.op))
+        out.append('(')
+        self.write_expr(node.left, out)
+        out.extend((' ', op, ' '))
+        self.write_expr(node.right, out)
+        out.append(')')
+
+    def _compare(self, node, out):
+        ops = [_CMPOP_MAP.get(type(op), str(op)) for op in node.ops]
+        out.append('(')
+        self.write_expr(node.left, out)
+        out.extend((' ', ' '.join(ops), ' '))
+        self.write_expr(node.comparators[0], out)
+        out.append(')')
+
+    def _call(self, node, out):
+        if isinstance(node.func, ast.Name):
+            if node.func.id == 'print':
+                out.append('std::cout << ')
+                self.write_joined(node.args, ' << ', out)
+                out.append(' << std::endl')
+                return
+            elif node.func.id == 'input':
+                out.append('std::cin >> ')
+                if node.args:
+                    self.write_expr(node.args[0], out)
                 else:
-                    return f"{node.func.id}({', '.join(args)})"
-            return f"{convert_python_expr(node.func)}({', '.join(args)})"
-        elif isinstance(node, ast.BoolOp):
-            op_map = {
-                ast.And: '&&',
-                ast.Or: '||',
-            }
-            op = op_map.get(type(node.op), str(node.op))
-            return f"({f' {op} '.join(convert_python_expr(v) for v in node.values)})"
-        elif isinstance(node, ast.UnaryOp):
-            op_map = {
-                ast.UAdd: '+',
-                ast.USub: '-',
-                ast.Not: '!',
-            }
-            op = op_map.get(type(node.op), str(node.op))
-            return f"{op}({convert_python_expr(node.operand)})"
-        return str(node)
+                    out.append('input_var')
+                return
+            out.append(node.func.id)
+        else:
+            self.write_expr(node.func, out)
+        out.append('(')
+        self.write_joined(node.args, ', ', out)
+        out.append(')')
+
+    def _boolop(self, node, out):
+        op = _BOOLOP_MAP.get(type(node.op), str(node.op))
+        out.append('(')
+        self.write_joined(node.values, f' {op} ', out)
+        out.append(')')
+
+    def _unaryop(self, node, out):
+        op = _UNARYOP_MAP.get(type(node.op), str(node.op))
+        out.extend((op, '('))
+        self.write_expr(node.operand, out)
+        out.append(')')
+
+    def _unknown(self, node, out):
+        # Attributes, subscripts and the like are spelled the same in C++
+        out.append(ast.unparse(node))
+
+    _DISPATCH = {
+        ast.Constant: _constant,
+        ast.Name: _name,
+        ast.BinOp: _binop,
+        ast.Compare: _compare,
+        ast.Call: _call,
+        ast.BoolOp: _boolop,
+        ast.UnaryOp: _unaryop,
+    }
+
+    def write_expr(self, node, out):
+        """Append the C++ translation of an expression to ``out`` as string chunks."""
+        mark = len(out)
+        try:
+            self._DISPATCH.get(type(node), PyToCppEmitter._unknown)(self, node, out)
+        except Exception as e:
+            logger.error("Error converting Python expression: %s", e)
+            del out[mark:]
+            out.append(str(node))
+
+    def write_joined(self, nodes, sep, out):
+        for i, node in enumerate(nodes):
+            if i:
+                out.append(sep)
+            self.write_expr(node, out)
+
+    def convert_python_expr(self, node):
+        """Convert Python AST expression to C++ code."""
+        out = []
+        self.write_expr(node, out)
+        return ''.join(out)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def python_to_cpp(python_code, _tree=None):
+    """Convert Python code to C++, reusing an already parsed ``_tree`` if given."""
+    try:
+        tree = _tree if _tree is not None else ast.parse(python_code)
+        emitter = PyToCppEmitter()
+        emitter.visit(tree)
+        return emitter.render()
     except Exception as e:
-        logger.error(f"Error converting Python expression: {str(e)}")
-        return str(node)
+        logger.error("Error converting Python to C++: %s", e)
+        return f"Error converting Python to C++: {str(e)}"
 
 def cpp_to_python(cpp_code):
     try:
@@ -297,48 +568,66 @@ def cpp_to_python(cpp_code):
         
         return '\n'.join(filtered_lines)
     except Exception as e:
-        logger.error(f"Error converting C++ to Python: {str(e)}")
+        logger.error("Error converting C++ to Python: %s", e)
         return f"Error converting C++ to Python: {str(e)}"
 
 def convert_cpp_line(line):
     """Convert a single line of C++ code to Python."""
     try:
         line = line.rstrip(';')
-        line = re.sub(r'(int|float|double|string|bool|auto)\s+(\w+)\s*=\s*', r'\2 = ', line)
+        # Cheap literal checks let most lines skip the regex engine entirely
+        if '=' in line:
+            line = _DECL_RE.sub(r'\2 = ', line)
         
         if 'std::cout' in line:
-            line = re.sub(r'std::cout\s*<<\s*', 'print(', line)
-            line = re.sub(r'\s*<<\s*std::endl', ')', line)
-            line = re.sub(r'\s*<<\s*', ' + ', line)
+            line = _COUT_RE.sub('print(', line)
+            line = _ENDL_RE.sub(')', line)
+            line = _STREAM_RE.sub(' + ', line)
         
         if 'std::cin' in line:
-            line = re.sub(r'std::cin\s*>>\s*', 'input()', line)
+            line = _CIN_RE.sub('input()', line)
         
-        line = re.sub(r'(int|float|double|string|bool|void)\s+(\w+)\s*\(([^)]*)\)', r'def \2(\3):', line)
-        line = line.replace('true', 'True').replace('false', 'False')
-        line = line.replace('&&', 'and').replace('||', 'or')
-        line = line.replace('==', '==').replace('!=', '!=')
-        line = re.sub(r'std::string\s*\(\s*"([^"]*)"\s*\)', r'"\1"', line)
+        if '(' in line:
+            line = _FUNCDEF_RE.sub(r'def \2(\3):', line)
+        line = _KW_RE.sub(lambda m: _KW_MAP[m.group(0)], line)
+        if 'std::string' in line:
+            line = _STRCTOR_RE.sub(r'"\1"', line)
         
         return line
     except Exception as e:
-        logger.error(f"Error converting C++ line: {str(e)}")
+        logger.error("Error converting C++ line: %s", e)
         return line
 
+@st.cache_data(max_entries=128, show_spinner=False)
 def highlight_code(code, language):
     try:
-        if language == 'python':
-            lexer = PythonLexer()
-        else:
-            lexer = CppLexer()
-        
-        formatter = HtmlFormatter(style='monokai')
-        highlighted = highlight(code, lexer, formatter)
+        lexer = _PY_LEXER if language == 'python' else _CPP_LEXER
+        highlighted = highlight(code, lexer, _FORMATTER)
         return highlighted
     except Exception as e:
-        logger.error(f"Error highlighting code: {str(e)}")
+        logger.error("Error highlighting code: %s", e)
         return code
 
+def code_block(code, language, highlighted_html):
+    """Render plain code, then its heading and highlighted HTML as one markdown element."""
+    # st.code keeps Streamlit's built-in copy icon on the plain panel
+    st.code(code, language=language)
+    # Encode newlines so blank lines inside <pre> don't end the HTML block
+    highlighted = highlighted_html.replace('\n', '&#10;')
+    st.markdown(
+        f'<h3>Syntax Highlighted Version</h3>'
+        f'<div class="code-output">{highlighted}</div>',
+        unsafe_allow_html=True
+    )
+
+def show_output(output_code, language):
+    """Render converted code along with its syntax highlighted version."""
+    label = "C++" if language == 'cpp' else "Python"
+    st.subheader(f"Converted {label} Code")
+    code_block(output_code, language, highlight_code(output_code, language))
+    
+    st.button("Copy to Clipboard", key=f"copy_{language}")
+
 # Set page config
 st.set_page_config(
     page_title="Convertifier",
@@ -405,6 +694,9 @@ with col1:
         help="Enable AI-powered conversion for more accurate and context-aware results"
     )
     
+    # Reruns triggered by other widgets reuse the last conversion of the same input
+    convert_key = (hash(input_code), source_language, use_ai)
+    
     if st.button("Convert", type="primary"):
         if not input_code.strip():
             st.error("Please enter some code to convert")
@@ -412,35 +704,27 @@ with col1:
             try:
                 # Validate input code
                 if source_language == "Python":
-                    is_valid, message = validate_python_code(input_code)
-                    if not is_valid:
+                    tree, message = validate_python_code(input_code)
+                    if tree is None:
                         st.error(message)
                     else:
                         # Try AI conversion first if enabled
                         if use_ai:
                             with st.spinner("Using AI to enhance conversion..."):
-                                ai_output, ai_error = get_ai_enhanced_conversion(input_code, "Python", "C++")
+                                ai_output, ai_error = get_ai_enhanced_conversion(input_code, "Python", "C++", tree=tree)
                                 if ai_output and not ai_error:
                                     output_code = format_code(ai_output, 'cpp')
                                     st.success("AI-enhanced conversion completed successfully!")
                                 else:
                                     st.warning(f"AI conversion failed: {ai_error}. Falling back to basic conversion.")
-                                    output_code = format_code(python_to_cpp(input_code), 'cpp')
+                                    output_code = format_code(python_to_cpp(input_code, _tree=tree), 'cpp')
                         else:
-                            output_code = format_code(python_to_cpp(input_code), 'cpp')
+                            output_code = format_code(python_to_cpp(input_code, _tree=tree), 'cpp')
                         
+                        st.session_state['last_key'] = convert_key
+                        st.session_state['last_output'] = output_code
                         with col2:
-                            st.subheader("Converted C++ Code")
-                            st.markdown('<div class="code-output">', unsafe_allow_html=True)
-                            st.code(output_code, language="cpp")
-                            st.markdown('</div>', unsafe_allow_html=True)
-                            
-                            st.markdown("### Syntax Highlighted Version")
-                            st.markdown('<div class="code-output">', unsafe_allow_html=True)
-                            st.markdown(highlight_code(output_code, 'cpp'), unsafe_allow_html=True)
-                            st.markdown('</div>', unsafe_allow_html=True)
-                            
-                            st.button("Copy to Clipboard", key="copy_cpp")
+                            show_output(output_code, 'cpp')
                 else:
                     is_valid, message = validate_cpp_code(input_code)
                     if not is_valid:
@@ -459,21 +743,16 @@ with col1:
                         else:
                             output_code = format_code(cpp_to_python(input_code), 'python')
                         
+                        st.session_state['last_key'] = convert_key
+                        st.session_state['last_output'] = output_code
                         with col2:
-                            st.subheader("Converted Python Code")
-                            st.markdown('<div class="code-output">', unsafe_allow_html=True)
-                            st.code(output_code, language="python")
-                            st.markdown('</div>', unsafe_allow_html=True)
-                            
-                            st.markdown("### Syntax Highlighted Version")
-                            st.markdown('<div class="code-output">', unsafe_allow_html=True)
-                            st.markdown(highlight_code(output_code, 'python'), unsafe_allow_html=True)
-                            st.markdown('</div>', unsafe_allow_html=True)
-                            
-                            st.button("Copy to Clipboard", key="copy_python")
+                            show_output(output_code, 'python')
             except Exception as e:
-                logger.error(f"Conversion error: {str(e)}")
+                logger.error("Conversion error: %s", e)
                 st.error(f"An error occurred during conversion: {str(e)}")
+    elif st.session_state.get('last_key') == convert_key:
+        with col2:
+            show_output(st.session_state['last_output'], 'cpp' if source_language == "Python" else 'python')
 
 # Add some helpful information
 st.markdown("""